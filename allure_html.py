@@ -1,99 +1,375 @@
-import json
+from __future__ import annotations
+
+import mmap
 import os
-from typing import Dict, List, Any
-from collections import defaultdict
+import stat
+from dataclasses import dataclass, field
+from typing import ClassVar, Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from collections import deque
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
+
+from json_compat import json_loads, orjson
+
+try:
+    import ijson
+except ImportError:  # optional, enables streaming of very large suites.json
+    ijson = None
+
+__all__ = [
+    'AllureResultsDirectParser',
+    'AllureSuiteParser',
+    'CaseSummary',
+    'LazyTestCase',
+    'SuiteSummary',
+    'create_allure_parser',
+    'detect_allure_directory_type',
+    'parse_allure_suite',
+]
+
+# File name suffixes of the raw allure-results files
+_RESULT_SUFFIX = '-result.json'
+_CONTAINER_SUFFIX = '-container.json'
+_PARSED_SUFFIXES = (_RESULT_SUFFIX, _CONTAINER_SUFFIX)
+
+# suites.json files at least this large are streamed with ijson when it is
+# installed instead of decoded as one tree
+_LARGE_FILE_THRESHOLD = 16 * 1024 * 1024
+
+# With orjson, JSON files at least this large are decoded straight from a
+# memory map instead of read into a bytes copy; below it the mapping costs
+# more than the copy it saves
+_MMAP_MIN_FILE_SIZE = 16 * 1024
+
+# Upper bound on threads used to read allure-results files concurrently
+_MAX_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# From this many result files on, decoding is CPU-bound enough that worker
+# processes beat threads despite their startup and pickling cost (given
+# more than one usable CPU)
+_PROCESS_POOL_MIN_FILES = 1000
+
+# Most result files handed to a worker process per task; smaller chunks
+# are used when needed to give every worker several tasks
+_PROCESS_POOL_MAX_CHUNKSIZE = 256
+
+# Suite status is its worst test case status:
+# failed > broken > skipped > any other status > passed
+_STATUS_RANK = {'passed': 0, 'skipped': 2, 'broken': 3, 'failed': 4}
+_OTHER_STATUS_RANK = 1
+_RANKED_STATUSES = ('passed', 'unknown', 'skipped', 'broken', 'failed')
+
+# Shared stand-in for absent nested objects such as 'time'; never mutated
+_EMPTY: Dict[str, Any] = {}
+
+
+def _read_json(path: str) -> Any:
+    """Read a JSON file and return the decoded object, memory-mapping it when worthwhile"""
+    with open(path, 'rb') as f:
+        # Only orjson decodes from a buffer without copying it first
+        if orjson is None or os.fstat(f.fileno()).st_size < _MMAP_MIN_FILE_SIZE:
+            return json_loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+
+
+def _usable_cpu_count() -> int:
+    """CPUs this process may run on (its affinity mask where the OS exposes one)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _label_map(labels: List[Dict]) -> Dict[str, Dict]:
+    """Index labels by name, keeping the first label for each name"""
+    return {label.get('name'): label for label in reversed(labels)}
+
+
+class LazyTestCase(MutableMapping):
+    """
+    Test case whose step tree is converted from the raw result on first access
+    
+    Has the same keys, in the same order, as an eager test case, so views
+    that only read name/title/status never pay for step conversion. It is
+    not a dict: pass default=LazyTestCase.materialize when JSON-encoding.
+    """
+    __slots__ = ('_fields', '_raw_steps', '_parse_steps')
+    
+    def __init__(self, fields: Dict[str, Any], raw_steps: List, parse_steps) -> None:
+        self._fields = fields  # Holds a 'steps' placeholder until first access
+        self._raw_steps = raw_steps
+        self._parse_steps = parse_steps
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == 'steps' and self._parse_steps is not None:
+            self._fields['steps'] = self._parse_steps(self._raw_steps)
+            self._raw_steps = self._parse_steps = None
+        return self._fields[key]
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == 'steps':
+            self._raw_steps = self._parse_steps = None
+        self._fields[key] = value
+    
+    def __delitem__(self, key: str) -> None:
+        if key == 'steps':
+            self._raw_steps = self._parse_steps = None
+        del self._fields[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+    
+    def __len__(self) -> int:
+        return len(self._fields)
+    
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._fields!r})"
+    
+    def materialize(self) -> Dict[str, Any]:
+        """Convert pending steps and return the underlying plain dict"""
+        if self._parse_steps is not None:
+            self['steps']  # Triggers the conversion
+        return self._fields
+
+
+@dataclass(slots=True)
+class CaseSummary:
+    """Display fields of one test case; slotted, so no per-instance dict"""
+    name: str
+    status: str
+    title: Optional[str] = None
+    
+    @classmethod
+    def from_case(cls, test_case: Dict[str, Any]) -> CaseSummary:
+        """Take the display fields of a parsed (or lazy) test case"""
+        get = test_case.get
+        return cls(get('name', 'Unknown'), get('status', 'unknown'), get('title'))
+
+
+@dataclass(slots=True)
+class SuiteSummary:
+    """
+    Display fields of one suite
+    
+    test_cases may hold only the first few cases; test_cases_count is
+    always the full count.
+    """
+    name: str
+    status: str
+    test_cases_count: int
+    test_cases: List[CaseSummary] = field(default_factory=list)
+    
+    @classmethod
+    def from_suite(cls, suite: Dict[str, Any], max_cases: Optional[int] = None) -> SuiteSummary:
+        """Take the display fields of a parsed suite and up to max_cases of its test cases"""
+        test_cases = suite['test-cases']
+        count = suite.get('test-cases-count')
+        if count is None:
+            count = len(test_cases)
+        if max_cases is not None:
+            # islice, not a slice: lazy case sequences are not forced past max_cases
+            test_cases = islice(test_cases, max_cases)
+        return cls(
+            suite.get('name', 'Unknown'),
+            suite.get('status', 'unknown'),
+            count,
+            [CaseSummary.from_case(tc) for tc in test_cases]
+        )
+
+
+def _finalize_timestamps(suite: Dict[str, Any]) -> None:
+    """Set suite start/stop from its test cases and stringify all timestamps"""
+    # Test case timestamps stay integers (0 when missing) until here, so
+    # the bounds come from one C-level min/max pass without re-parsing
+    test_cases = suite['test-cases']
+    start = min((tc['start'] for tc in test_cases if tc['start']), default=0)
+    stop = max((tc['stop'] for tc in test_cases if tc['stop']), default=0)
+    suite['start'] = str(start) if start else ''
+    suite['stop'] = str(stop) if stop else ''
+    for tc in test_cases:
+        tc['start'] = str(tc['start']) if tc['start'] else ''
+        tc['stop'] = str(tc['stop']) if tc['stop'] else ''
+
 
 class AllureSuiteParser:
+    directory_type: ClassVar[str] = 'report'
+    display_name: ClassVar[str] = 'AllureSuiteParser'
+
     def __init__(self, allure_report_dir: str,testcase_status=None):
         """Initialize parser with allure report directory path"""
         self.report_dir = allure_report_dir
         self.data_dir = os.path.join(allure_report_dir, 'data')
         self.suites_file = os.path.join(self.data_dir, 'suites.json')
         self.test_cases_dir = os.path.join(self.data_dir, 'test-cases')
+        # Directory prefix with trailing separator; case files are built by concatenation
+        self._tc_prefix = os.path.join(self.test_cases_dir, '')
         self.testcase_status=testcase_status
         
         if not os.path.exists(self.suites_file):
             raise FileNotFoundError(f"Suites file not found: {self.suites_file}")
+        
+        # Without a filter, bind the unfiltered parser directly so the
+        # per-case status check is not paid at all
+        if not testcase_status:
+            self._parse_test_case = self._parse_test_case_nofilter
     
-    def parse(self) -> Dict[str, Any]:
-        """Parse suites.json and test cases to return formatted data"""
-        with open(self.suites_file, 'r', encoding='utf-8') as f:
-            suites_data = json.load(f)
-            
+    def parse(self, lazy: bool = False) -> Dict[str, Any]:
+        """
+        Parse suites.json and test cases to return formatted data
+        
+        With lazy=True test cases are LazyTestCase mappings whose steps
+        are converted only when read.
+        """
         result = {
-            "test-suites": self._parse_suites(suites_data.get('children', []))
+            "test-suites": list(self.iter_suites(lazy))
         }
         
         return result
     
-    def _parse_suites(self, suites: List) -> List[Dict[str, Any]]:
-        """Parse test suites information"""
-        parsed_suites = []
+    def iter_suites(self, lazy: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield parsed suites one at a time, reading test cases as each suite is reached"""
+        return self._parse_suites(self._read_top_level_suites(), lazy)
+    
+    def parse_summary(self) -> List[SuiteSummary]:
+        """Parse only the display fields (name, title, status) of every suite and test case"""
+        return list(self.iter_summaries())
+    
+    def iter_summaries(self) -> Iterator[SuiteSummary]:
+        """
+        Yield a SuiteSummary per suite, in the same order as iter_suites()
         
-        for suite in suites:
-            # Extract suite information
-            suite_info = {
-                "name": suite.get('name', ''),
-                # "title": suite.get('name', ''),  # Using name as title if not specified
-                "description": "",  # No description in suites.json
-                "status": "passed",  # Default status
-                "start": "",  # Will be updated from test cases
-                "stop": "",  # Will be updated from test cases
-                "test-cases": []
-            }
+        Test case files are still decoded, but steps, labels and parameters
+        are never converted or kept.
+        """
+        return self._parse_suites(self._read_top_level_suites(), summary=True)
+    
+    def _read_top_level_suites(self) -> Iterator[Dict]:
+        """Yield the top-level children of suites.json"""
+        if ijson is not None and os.path.getsize(self.suites_file) >= _LARGE_FILE_THRESHOLD:
+            # Stream one top-level suite at a time instead of loading the tree
+            with open(self.suites_file, 'rb') as f:
+                yield from ijson.items(f, 'children.item', use_float=True)
+        else:
+            yield from _read_json(self.suites_file).get('children', [])
+    
+    def _parse_suites(self, suites: Iterable[Dict], lazy: bool = False, summary: bool = False) -> Iterator[Any]:
+        """Parse test suites information, yielding each suite with test cases (or its SuiteSummary)"""
+        parse_case = self._summarize_test_case if summary else self._parse_test_case
+        for root in suites:
+            # Explicit stack instead of recursion: a suite is pushed back with
+            # its parsed info above its sub-suites, so it is yielded after
+            # all of them, in the same order the recursive walk produced
+            pending = deque([(root, None)])
             
-            # Process test cases in this suite
-            if 'children' in suite:
-                for child in suite['children']:
+            while pending:
+                suite, suite_info = pending.pop()
+                if suite_info is not None:
+                    # All sub-suites of this suite have been emitted
+                    if summary and suite_info['test-cases']:
+                        yield SuiteSummary(
+                            suite_info['name'], suite_info['status'],
+                            len(suite_info['test-cases']), suite_info['test-cases']
+                        )
+                    elif suite_info['test-cases']:
+                        suite_info['test-cases-count'] = len(suite_info['test-cases'])
+                        _finalize_timestamps(suite_info)
+                        yield suite_info
+                    continue
+                
+                # Extract suite information
+                suite_info = {
+                    "name": suite.get('name', ''),
+                    # "title": suite.get('name', ''),  # Using name as title if not specified
+                    "description": "",  # No description in suites.json
+                    "status": "passed",  # Default status
+                    "start": "",  # Set from test cases once the suite is complete
+                    "stop": "",  # Set from test cases once the suite is complete
+                    "test-cases": []
+                }
+                
+                # Process test cases in this suite, deferring sub-suites
+                sub_suites = []
+                for child in suite.get('children') or ():
                     if 'children' in child:
-                        # This is a sub-suite
-                        sub_suites = self._parse_suites([child])
-                        if sub_suites:
-                            parsed_suites.extend(sub_suites)
+                        sub_suites.append(child)
                     else:
-                        # This is a test case
-                        test_case = self._parse_test_case(child)
+                        test_case = parse_case(child, lazy)
                         if test_case:
                             suite_info['test-cases'].append(test_case)
-                            
-                            # Update suite timestamps
-                            if test_case['start'] and (not suite_info['start'] or int(test_case['start']) < int(suite_info['start'])):
-                                suite_info['start'] = test_case['start']
-                            if test_case['stop'] and (not suite_info['stop'] or int(test_case['stop']) > int(suite_info['stop'])):
-                                suite_info['stop'] = test_case['stop']
-            
-            if suite_info['test-cases']:
-                parsed_suites.append(suite_info)
+                
+                pending.append((suite, suite_info))
+                pending.extend((child, None) for child in reversed(sub_suites))
+    
+    def _parse_test_case(self, case: Dict, lazy: bool = False) -> Dict[str, Any]:
+        """Parse test case information if it matches the status filter"""
+        # suites.json leaves carry the status, so most non-matching cases
+        # are skipped without reading their test case file
+        if case.get('status', self.testcase_status) != self.testcase_status:
+            return None
         
-        return parsed_suites
+        test_case = self._parse_test_case_nofilter(case, lazy)
+        if test_case and test_case['status'] != self.testcase_status:
+            return None
+        return test_case
     
-    def _parse_test_case(self, case: Dict) -> Dict[str, Any]:
-        """Parse test case information"""
+    def _summarize_test_case(self, case: Dict, lazy: bool = False) -> Optional[CaseSummary]:
+        """Read only the display fields of a test case, applying the status filter"""
+        status_filter = self.testcase_status
+        if status_filter and case.get('status', status_filter) != status_filter:
+            return None
+        
+        case_data = self._read_test_case(case)
+        if case_data is None:
+            return None
+        get = case_data.get
+        status = get('status', '')
+        if status_filter and status != status_filter:
+            return None
+        return CaseSummary(get('fullName', ''), status, get('title', ''))
+    
+    def _read_test_case(self, case: Dict) -> Optional[Dict]:
+        """Read the test case file of a suites.json leaf, or None if it has none"""
         case_uid = case.get('uid', '')
         if not case_uid:
             return None
             
-        case_file = os.path.join(self.test_cases_dir, f"{case_uid}.json")
-        if not os.path.exists(case_file):
+        case_file = self._tc_prefix + case_uid + '.json'
+        try:
+            # Opening directly is one syscall; an exists() check first was two
+            return _read_json(case_file)
+        except FileNotFoundError:
+            return None
+    
+    def _parse_test_case_nofilter(self, case: Dict, lazy: bool = False) -> Dict[str, Any]:
+        """Parse test case information"""
+        case_data = self._read_test_case(case)
+        if case_data is None:
             return None
-            
-        with open(case_file, 'r', encoding='utf-8') as f:
-            case_data = json.load(f)
-        # Check if testcase_status is None or matches the case status
 
+        get = case_data.get
+        time = get('time') or _EMPTY
+        labels = get('labels', [])
+        raw_steps = (get('testStage') or _EMPTY).get('steps', [])
         test_case = {
-            "name": case_data.get('fullName', ''),
-            "title": case_data.get('title', ''),
-            "description": case_data.get('description', ''),
-            "severity": self._get_severity(case_data.get('labels', [])),
-            "status": case_data.get('status', ''),
-            "start": str(case_data.get('time', {}).get('start', '')),
-            "stop": str(case_data.get('time', {}).get('stop', '')),
-            "labels": case_data.get('labels', []),
-            "parameters": case_data.get('parameters', []),
-            "steps": self._parse_steps(case_data.get('testStage', {}).get('steps', []))
+            "name": get('fullName', ''),
+            "title": get('title', ''),
+            "description": get('description', ''),
+            "severity": self._get_severity(labels),
+            "status": get('status', ''),
+            "status-message": get('statusMessage', ''),
+            "status-trace": get('statusTrace', ''),
+            "start": time.get('start') or 0,
+            "stop": time.get('stop') or 0,
+            "labels": labels,
+            "parameters": get('parameters', []),
+            "steps": None if lazy else self._parse_steps(raw_steps)
         }
         
+        if lazy:
+            return LazyTestCase(test_case, raw_steps, self._parse_steps)
         return test_case
     
     def _get_severity(self, labels: List) -> str:
@@ -106,24 +382,34 @@ class AllureSuiteParser:
     def _parse_steps(self, steps: List) -> List[Dict[str, Any]]:
         """Parse test steps information"""
         parsed_steps = []
+        # FIFO worklist of (parent list, raw step) keeps sibling order
+        # without a Python call frame per nesting level
+        pending = deque((parsed_steps, step) for step in steps)
         
-        for step in steps:
-            step_info = {
-                "name": step.get('name', ''),
-                "title": step.get('title', ''),
-                "status": step.get('status', ''),
-                "start": str(step.get('time', {}).get('start', '')),
-                "stop": str(step.get('time', {}).get('stop', '')),
-                "attachments": step.get('attachments', []),
-                "steps": self._parse_steps(step.get('steps', []))
-            }
-            parsed_steps.append(step_info)
+        while pending:
+            parent, step = pending.popleft()
+            get = step.get
+            time = get('time') or _EMPTY
+            child_steps = []
+            parent.append({
+                "name": get('name', ''),
+                "title": get('title', ''),
+                "status": get('status', ''),
+                "start": str(time.get('start', '')),
+                "stop": str(time.get('stop', '')),
+                "attachments": get('attachments', []),
+                "steps": child_steps
+            })
+            pending.extend((child_steps, child) for child in get('steps', []))
             
         return parsed_steps
 
 class AllureResultsDirectParser:
     """Parser for allure-results directory (raw test execution output)"""
     
+    directory_type: ClassVar[str] = 'results'
+    display_name: ClassVar[str] = 'AllureResultsDirectParser'
+
     def __init__(self, allure_results_dir: str, testcase_status=None):
         """
         Initialize parser with allure-results directory path
@@ -135,114 +421,186 @@ class AllureResultsDirectParser:
         self.results_dir = allure_results_dir
         self.testcase_status = testcase_status
         
-        if not os.path.exists(allure_results_dir):
-            raise FileNotFoundError(f"Results directory not found: {allure_results_dir}")
+        # Classify the directory entries once; the readers reuse these lists.
+        # is_file() answers from the directory entry type, without a stat
+        # call, except for symlinks
+        self._result_paths = []
+        self._container_paths = []
+        try:
+            with os.scandir(allure_results_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    # Attachments usually dominate the directory; one tuple
+                    # endswith rejects them before any further checks
+                    if not name.endswith(_PARSED_SUFFIXES) or not entry.is_file():
+                        continue
+                    if name.endswith(_RESULT_SUFFIX):
+                        self._result_paths.append(entry.path)
+                    else:
+                        self._container_paths.append(entry.path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Results directory not found: {allure_results_dir}") from None
         
         # Verify it's actually a results directory
-        result_files = [f for f in os.listdir(allure_results_dir) if f.endswith('-result.json')]
-        if not result_files:
+        if not self._result_paths:
             raise ValueError(f"No allure result files found in: {allure_results_dir}")
     
-    def parse(self) -> Dict[str, Any]:
-        """Parse allure-results and return formatted data"""
-        # Step 1: Read all result and container files
-        results = self._read_result_files()
-        containers = self._read_container_files()
-        
-        # Step 2: Build suite hierarchy
-        suites = self._build_suite_hierarchy(results, containers)
+    def parse(self, lazy: bool = False, parallel: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Parse allure-results and return formatted data
         
+        With lazy=True test cases are LazyTestCase mappings whose steps
+        are converted only when read. parallel=True decodes result files
+        in worker processes, False in threads; None (default) picks
+        processes from _PROCESS_POOL_MIN_FILES files on when more than one
+        CPU is usable. Multi-threaded callers should pass False, since the
+        pool is forked.
+        """
         return {
-            "test-suites": suites
+            "test-suites": list(self.iter_suites(lazy, parallel))
         }
     
-    def _read_result_files(self) -> List[Dict]:
-        """Read all *-result.json files"""
-        results = []
-        for filename in os.listdir(self.results_dir):
-            if filename.endswith('-result.json'):
-                filepath = os.path.join(self.results_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        results.append(data)
-                except Exception as e:
-                    print(f"Warning: Failed to read {filename}: {e}")
-        return results
+    def iter_suites(self, lazy: bool = False, parallel: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield parsed suites one at a time
+        
+        Suites group result files by label, so every file is read before
+        the first suite is yielded.
+        """
+        # Step 1: Convert all result files, read container files
+        # Step 2: Build suite hierarchy; no reference to the flat case list
+        # is kept here, so emitted suites can be freed by the consumer
+        yield from self._build_suite_hierarchy(
+            self._parse_result_files(lazy, parallel), self._read_container_files()
+        )
+    
+    def parse_summary(self, parallel: Optional[bool] = None) -> List[SuiteSummary]:
+        """Parse only the display fields (name, title, status) of every suite and test case"""
+        return list(self.iter_summaries(parallel))
+    
+    def iter_summaries(self, parallel: Optional[bool] = None) -> Iterator[SuiteSummary]:
+        """
+        Yield a SuiteSummary per suite, in the same order as iter_suites()
+        
+        Result files are still decoded, but only the display fields are
+        kept while grouping, and container files are not read.
+        """
+        groups: Dict[str, List[CaseSummary]] = {}
+        for suite_name, case in self._parse_result_files(parallel=parallel, summary=True):
+            groups.setdefault(suite_name, []).append(case)
+        
+        for suite_name in list(groups):
+            cases = groups.pop(suite_name)
+            worst = max(_STATUS_RANK.get(case.status, _OTHER_STATUS_RANK) for case in cases)
+            yield SuiteSummary(suite_name, _RANKED_STATUSES[worst], len(cases), cases)
+    
+    def _parse_result_files(self, lazy: bool = False, parallel: Optional[bool] = None, summary: bool = False) -> List[Tuple[str, Any]]:
+        """Convert all *-result.json files to (suite name, test case or CaseSummary) pairs"""
+        parse_one = partial(self._parse_result_file, testcase_status=self.testcase_status, lazy=lazy, summary=summary)
+        paths = self._result_paths
+        
+        if parallel is None:
+            parallel = len(paths) >= _PROCESS_POOL_MIN_FILES and _usable_cpu_count() > 1
+        if parallel:
+            # Decoding is CPU-bound here, so spread it over processes;
+            # chunks amortize the pickling round trip per file
+            # Imported here: it pulls in multiprocessing, which most runs
+            # (and every import of this module) never need
+            from concurrent.futures import ProcessPoolExecutor
+            workers = _usable_cpu_count()
+            chunksize = max(1, min(_PROCESS_POOL_MAX_CHUNKSIZE, len(paths) // (workers * 4)))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = executor.map(parse_one, paths, chunksize=chunksize)
+                return [pair for pair in parsed if pair is not None]
+        
+        with ThreadPoolExecutor(max_workers=_MAX_READ_WORKERS) as executor:
+            return [pair for pair in executor.map(parse_one, paths) if pair is not None]
+    
+    @classmethod
+    def _parse_result_file(cls, filepath: str, testcase_status=None, lazy: bool = False, summary: bool = False) -> Optional[Tuple[str, Any]]:
+        """
+        Read one result file and convert it to a (suite name, test case) pair
+        
+        Stateless so it can run in worker processes. Returns None for
+        unreadable files and for results excluded by testcase_status.
+        With summary=True the pair holds a CaseSummary instead.
+        """
+        result = cls._load_one(filepath)
+        if result is None:
+            return None
+        
+        # Filter by status if specified
+        if testcase_status and result.get('status', '') != testcase_status:
+            return None
+        
+        # Index labels once for the suite name and severity lookups
+        labels_by_name = _label_map(result.get('labels', []))
+        if summary:
+            get = result.get
+            return cls._get_suite_name(result, labels_by_name), CaseSummary(get('fullName', ''), get('status', ''), get('name', ''))
+        return cls._get_suite_name(result, labels_by_name), cls._parse_test_result(result, labels_by_name, lazy)
     
     def _read_container_files(self) -> Dict[str, Dict]:
         """Read all *-container.json files, indexed by uuid"""
         containers = {}
-        for filename in os.listdir(self.results_dir):
-            if filename.endswith('-container.json'):
-                filepath = os.path.join(self.results_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        uuid = data.get('uuid')
-                        if uuid:
-                            containers[uuid] = data
-                except Exception as e:
-                    print(f"Warning: Failed to read {filename}: {e}")
+        for data in self._read_files(self._container_paths):
+            uuid = data.get('uuid')
+            if uuid:
+                containers[uuid] = data
         return containers
     
-    def _build_suite_hierarchy(self, results: List[Dict], containers: Dict[str, Dict]) -> List[Dict]:
-        """Build hierarchical suite structure from flat results"""
-        # Group test cases by their suite name
-        suite_map = defaultdict(list)
+    def _read_files(self, filepaths: List[str]) -> List[Dict]:
+        """Read the given JSON files concurrently, skipping unreadable ones"""
+        # Many small files: threads overlap the blocking reads, and map()
+        # keeps directory order so the output stays deterministic
+        with ThreadPoolExecutor(max_workers=_MAX_READ_WORKERS) as executor:
+            return [data for data in executor.map(self._load_one, filepaths) if data is not None]
+    
+    @staticmethod
+    def _load_one(filepath: str) -> Any:
+        """Read a single JSON file, returning None if it cannot be read"""
+        try:
+            return _read_json(filepath)
+        except Exception as e:
+            print(f"Warning: Failed to read {os.path.basename(filepath)}: {e}")
+            return None
+    
+    def _build_suite_hierarchy(self, test_cases: List[Tuple[str, Dict[str, Any]]], containers: Dict[str, Dict]) -> Iterator[Dict]:
+        """Build hierarchical suite structure from flat (suite name, test case) pairs, one suite at a time"""
+        # Group test cases by their suite name, tracking the worst status
+        # rank of each group in the same pass
+        groups = {}
         
-        for result in results:
-            # Filter by status if specified
-            status = result.get('status', '')
-            if self.testcase_status and status != self.testcase_status:
-                continue
-            
-            # Get suite name from labels
-            suite_name = self._get_suite_name(result)
-            
-            # Parse test case
-            test_case = self._parse_test_result(result)
-            suite_map[suite_name].append(test_case)
+        for suite_name, test_case in test_cases:
+            group = groups.get(suite_name)
+            if group is None:
+                group = groups[suite_name] = {'cases': [], 'worst': 0}
+            group['cases'].append(test_case)
+            group['worst'] = max(group['worst'], _STATUS_RANK.get(test_case['status'], _OTHER_STATUS_RANK))
+        del test_cases
         
-        # Convert map to list of suites
-        suites = []
-        for suite_name, test_cases in suite_map.items():
-            if not test_cases:
-                continue
-            
-            # Calculate suite-level aggregations
-            start_times = [int(tc['start']) for tc in test_cases if tc['start'] and str(tc['start']).isdigit()]
-            stop_times = [int(tc['stop']) for tc in test_cases if tc['stop'] and str(tc['stop']).isdigit()]
-            
+        # Convert groups to suites, dropping each group once its suite is out
+        for suite_name in list(groups):
+            group = groups.pop(suite_name)
             suite = {
                 "name": suite_name,
                 "description": "",
-                "status": self._aggregate_status(test_cases),
-                "start": str(min(start_times)) if start_times else "",
-                "stop": str(max(stop_times)) if stop_times else "",
-                "test-cases": test_cases
+                "status": _RANKED_STATUSES[group['worst']],
+                "start": "",
+                "stop": "",
+                "test-cases": group['cases'],
+                "test-cases-count": len(group['cases'])
             }
-            suites.append(suite)
-        
-        return suites
+            _finalize_timestamps(suite)
+            yield suite
     
-    def _get_suite_name(self, result: Dict) -> str:
+    @staticmethod
+    def _get_suite_name(result: Dict, labels_by_name: Dict[str, Dict]) -> str:
         """Extract suite name from labels"""
-        labels = result.get('labels', [])
-        
-        # Priority 1: Look for 'suite' label
-        for label in labels:
-            if label.get('name') == 'suite':
-                return label.get('value', 'Default Suite')
-        
-        # Priority 2: Look for 'parentSuite' label
-        for label in labels:
-            if label.get('name') == 'parentSuite':
-                return label.get('value', 'Default Suite')
-        
-        # Priority 3: Use package label
-        for label in labels:
-            if label.get('name') == 'package':
+        # Priority: 'suite' label, then 'parentSuite', then 'package'
+        for name in ('suite', 'parentSuite', 'package'):
+            label = labels_by_name.get(name)
+            if label is not None:
                 return label.get('value', 'Default Suite')
         
         # Fallback: Extract from fullName (module path)
@@ -254,70 +612,73 @@ class AllureResultsDirectParser:
         
         return 'Default Suite'
     
-    def _parse_test_result(self, result: Dict) -> Dict[str, Any]:
+    @classmethod
+    def _parse_test_result(cls, result: Dict, labels_by_name: Dict[str, Dict], lazy: bool = False) -> Dict[str, Any]:
         """Convert result.json format to enriched test case format"""
-        return {
-            "name": result.get('fullName', ''),
-            "title": result.get('name', ''),
-            "description": result.get('description', ''),
-            "severity": self._get_severity(result.get('labels', [])),
-            "status": result.get('status', ''),
-            "start": str(result.get('start', '')),
-            "stop": str(result.get('stop', '')),
-            "labels": result.get('labels', []),
-            "parameters": result.get('parameters', []),
-            "steps": self._parse_steps(result.get('steps', []))
+        get = result.get
+        raw_steps = get('steps', [])
+        status_details = get('statusDetails') or _EMPTY
+        test_case = {
+            "name": get('fullName', ''),
+            "title": get('name', ''),
+            "description": get('description', ''),
+            "severity": cls._get_severity(labels_by_name),
+            "status": get('status', ''),
+            "status-message": status_details.get('message', ''),
+            "status-trace": status_details.get('trace', ''),
+            "start": get('start') or 0,
+            "stop": get('stop') or 0,
+            "labels": get('labels', []),
+            "parameters": get('parameters', []),
+            "steps": None if lazy else cls._parse_steps(raw_steps)
         }
+        
+        if lazy:
+            return LazyTestCase(test_case, raw_steps, cls._parse_steps)
+        return test_case
     
-    def _get_severity(self, labels: List) -> str:
-        """Extract severity from labels"""
-        for label in labels:
-            if label.get('name') == 'severity':
-                return label.get('value', 'normal')
+    @staticmethod
+    def _get_severity(labels_by_name: Dict[str, Dict]) -> str:
+        """Extract severity from indexed labels"""
+        label = labels_by_name.get('severity')
+        if label is not None:
+            return label.get('value', 'normal')
         return 'normal'
     
-    def _parse_steps(self, steps: List) -> List[Dict[str, Any]]:
-        """Parse test steps information recursively"""
+    @staticmethod
+    def _parse_steps(steps: List) -> List[Dict[str, Any]]:
+        """Parse nested test steps iteratively"""
         parsed_steps = []
+        # FIFO worklist of (parent list, raw step) keeps sibling order
+        # without a Python call frame per nesting level
+        pending = deque((parsed_steps, step) for step in steps)
         
-        for step in steps:
-            step_info = {
-                "name": step.get('name', ''),
-                "title": step.get('name', ''),  # allure-results don't have separate title field
-                "status": step.get('status', ''),
-                "start": str(step.get('start', '')),
-                "stop": str(step.get('stop', '')),
-                "attachments": step.get('attachments', []),
-                "steps": self._parse_steps(step.get('steps', []))  # Recursive for nested steps
-            }
-            parsed_steps.append(step_info)
+        while pending:
+            parent, step = pending.popleft()
+            get = step.get
+            name = get('name', '')
+            child_steps = []
+            parent.append({
+                "name": name,
+                "title": name,  # allure-results don't have separate title field
+                "status": get('status', ''),
+                "start": str(get('start', '')),
+                "stop": str(get('stop', '')),
+                "attachments": get('attachments', []),
+                "steps": child_steps
+            })
+            pending.extend((child_steps, child) for child in get('steps', []))
         
         return parsed_steps
-    
-    def _aggregate_status(self, test_cases: List[Dict]) -> str:
-        """Determine suite status from test case statuses"""
-        statuses = [tc.get('status', '') for tc in test_cases]
-        
-        if not statuses:
-            return 'unknown'
-        
-        # Priority: failed > broken > skipped > passed
-        if 'failed' in statuses:
-            return 'failed'
-        elif 'broken' in statuses:
-            return 'broken'
-        elif 'skipped' in statuses:
-            return 'skipped'
-        elif all(s == 'passed' for s in statuses):
-            return 'passed'
-        
-        return 'unknown'
 
 
 def detect_allure_directory_type(path: str) -> str:
     """
     Detect whether the path is an allure-report or allure-results directory
     
+    Results are cached per path, directory identity and mtime, so repeated
+    calls on an unchanged directory cost a single stat.
+    
     Args:
         path: Directory path to check
     
@@ -328,43 +689,60 @@ def detect_allure_directory_type(path: str) -> str:
     Raises:
         ValueError: If path is neither a valid report nor results directory
     """
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Directory not found: {path}")
+    # One stat answers existence, type and the cache key
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        raise FileNotFoundError(f"Directory not found: {path}") from None
     
-    if not os.path.isdir(path):
+    if not stat.S_ISDIR(st.st_mode):
         raise ValueError(f"Path is not a directory: {path}")
     
+    try:
+        return _detect_directory_type(path, st.st_dev, st.st_ino, st.st_mtime_ns)
+    except ValueError:
+        # Invalid directories raise inside the cache, so they are never cached
+        raise ValueError(
+            f"Invalid directory: {path}\n"
+            "Expected either:\n"
+            "  - allure-report (with data/suites.json)\n"
+            "  - allure-results (with *-result.json files)"
+        ) from None
+
+
+@lru_cache(maxsize=128)
+def _detect_directory_type(path: str, dev: int, ino: int, mtime_ns: int) -> str:
+    """Probe a directory; dev, ino and mtime_ns only key the cache"""
     # Check for allure-report structure (has data/suites.json)
     suites_file = os.path.join(path, 'data', 'suites.json')
     if os.path.exists(suites_file):
         return 'report'
     
-    # Check for allure-results structure (has *-result.json files)
-    files = os.listdir(path)
-    has_result_files = any(f.endswith('-result.json') for f in files)
-    if has_result_files:
-        return 'results'
+    # Check for allure-results structure (has *-result.json files),
+    # stopping at the first match instead of listing the whole directory
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.endswith(_RESULT_SUFFIX) and entry.is_file():
+                return 'results'
     
-    raise ValueError(
-        f"Invalid directory: {path}\n"
-        "Expected either:\n"
-        "  - allure-report (with data/suites.json)\n"
-        "  - allure-results (with *-result.json files)"
-    )
+    raise ValueError(path)
 
 
-def create_allure_parser(path: str, testcase_status=None):
+def create_allure_parser(path: str, testcase_status=None, dir_type: Optional[str] = None):
     """
     Factory function that auto-detects format and returns appropriate parser
     
     Args:
         path: Path to allure-results or allure-report directory
         testcase_status: Optional filter for test case status
+        dir_type: Result of detect_allure_directory_type if the caller
+            already has it; detection is skipped when given
     
     Returns:
         Parser instance (AllureSuiteParser or AllureResultsDirectParser)
     """
-    dir_type = detect_allure_directory_type(path)
+    if dir_type is None:
+        dir_type = detect_allure_directory_type(path)
     
     if dir_type == 'report':
         return AllureSuiteParser(path, testcase_status)
@@ -0,0 +1,225 @@
+"""Output views over parsed allure results, sized for LLM context windows"""
+from collections import Counter
+from itertools import chain
+from operator import methodcaller
+from typing import Dict, Any, Iterable, List, Optional
+
+__all__ = ['FAIL_STATUSES', 'compact_case', 'render_output']
+
+
+# Statuses listed as failures, and the statuses counted separately in summaries
+FAIL_STATUSES = frozenset({'failed', 'broken'})
+_KNOWN_STATUSES = frozenset({'passed', 'failed', 'broken', 'skipped', 'unknown'})
+
+# C-level accessor: with map() and Counter, counting runs without Python bytecode per case
+_get_status = methodcaller('get', 'status', 'unknown')
+
+
+def _count_statuses(test_cases: Iterable[Dict[str, Any]]) -> Counter:
+    """Tally test cases by status (missing status counts as 'unknown')"""
+    return Counter(map(_get_status, test_cases))
+
+
+def _create_summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a summary view with statistics only (most compact)"""
+    test_suites = result.get('test-suites', [])
+    
+    # Flatten once; statuses are then tallied without bytecode per case
+    cases = [(suite.get('name', ''), tc) for suite in test_suites for tc in suite.get('test-cases', [])]
+    total_tests = len(cases)
+    counted = _count_statuses(tc for _, tc in cases)
+    status_counts = {status: counted.pop(status, 0) for status in _KNOWN_STATUSES}
+    status_counts['unknown'] += sum(counted.values())  # Unrecognized statuses
+    
+    # Collect failed/broken tests for quick reference, stopping at the limit
+    # Columns are filled during the scan; row dicts are built once afterwards
+    suite_col = []
+    name_col = []
+    status_col = []
+    for suite_name, tc in cases:
+        get = tc.get
+        status = get('status', 'unknown')
+        if status in FAIL_STATUSES:
+            suite_col.append(suite_name)
+            name_col.append(get('title', get('name', '')))
+            status_col.append(status)
+            if len(status_col) == 20:  # Limit to 20 failed tests
+                break
+    failed_tests = [
+        {'suite': suite_name, 'name': name, 'status': status}
+        for suite_name, name, status in zip(suite_col, name_col, status_col)
+    ]
+    
+    pass_rate = (status_counts['passed'] / total_tests * 100) if total_tests > 0 else 0
+    
+    return {
+        'summary': {
+            'total_suites': len(test_suites),
+            'total_tests': total_tests,
+            'passed': status_counts['passed'],
+            'failed': status_counts['failed'],
+            'broken': status_counts['broken'],
+            'skipped': status_counts['skipped'],
+            'pass_rate': f"{pass_rate:.1f}%"
+        },
+        'failed_tests': failed_tests,
+        'suites': [{'name': s.get('name', ''), 'status': s.get('status', ''), 'test_count': len(s.get('test-cases', []))} for s in test_suites]
+    }
+
+
+def compact_case(tc: Dict[str, Any]) -> Dict[str, Any]:
+    """Minimal test case info; non-passed cases also list up to 5 failed steps"""
+    get = tc.get
+    status = get('status', '')
+    compact_case = {
+        'name': get('title', get('name', '')),
+        'status': status,
+    }
+    
+    # Only add steps summary for non-passed tests
+    if status != 'passed':
+        steps = get('steps', [])
+        if steps:
+            # Only include failed steps
+            failed_steps = [s.get('name', '') for s in steps if s.get('status') != 'passed']
+            if failed_steps:
+                compact_case['failed_steps'] = failed_steps[:5]  # Limit to 5
+    
+    return compact_case
+
+
+def _create_compact(result: Dict[str, Any], include_passed: bool = False) -> Dict[str, Any]:
+    """Create a compact view focusing on failures with minimal details"""
+    test_suites = result.get('test-suites', [])
+    
+    compact_suites = []
+    counted = _count_statuses(chain.from_iterable(suite.get('test-cases', []) for suite in test_suites))
+    total_passed = counted['passed']
+    total_failed = sum(counted.values()) - total_passed
+    
+    for suite in test_suites:
+        test_cases = suite.get('test-cases', [])
+        if not include_passed:
+            # Skip passed tests in compact mode; mostly-green suites drop out here
+            test_cases = [tc for tc in test_cases if tc.get('status', '') != 'passed']
+            if not test_cases:
+                continue
+        
+        compact_cases = [compact_case(tc) for tc in test_cases]
+        
+        if compact_cases:
+            compact_suites.append({
+                'name': suite.get('name', ''),
+                'status': suite.get('status', ''),
+                'test-cases': compact_cases
+            })
+    
+    return {
+        'overview': {
+            'total_passed': total_passed,
+            'total_failed': total_failed,
+            'showing': 'failed_only' if not include_passed else 'all'
+        },
+        'test-suites': compact_suites
+    }
+
+
+def _truncate_steps(steps: List[Dict], max_depth: int) -> List[Dict]:
+    """Truncate a step tree to max_depth levels and 10 steps per level"""
+    if max_depth <= 0 or not steps:
+        return []
+    
+    truncated = []
+    # Worklist of (output list, source steps, depth) instead of recursion;
+    # each level's list is filled by a single work item, so order is kept
+    pending = [(truncated, steps, 0)]
+    while pending:
+        target, level_steps, depth = pending.pop()
+        for step in level_steps[:10]:  # Max 10 steps per level
+            get = step.get
+            truncated_step = {
+                'name': get('name', ''),
+                'status': get('status', ''),
+            }
+            child_steps = get('steps')
+            if depth < max_depth - 1 and child_steps:
+                truncated_step['steps'] = []
+                pending.append((truncated_step['steps'], child_steps, depth + 1))
+            target.append(truncated_step)
+        
+        if len(level_steps) > 10:
+            target.append({'name': f'... and {len(level_steps) - 10} more steps', 'status': 'truncated'})
+    
+    return truncated
+
+
+def _detailed_case(tc: Dict[str, Any], max_step_depth: int) -> Dict[str, Any]:
+    """Test case info with its step tree truncated to max_step_depth"""
+    get = tc.get
+    detailed_case = {
+        'name': get('name', ''),
+        'title': get('title', ''),
+        'status': get('status', ''),
+        'severity': get('severity', 'normal'),
+    }
+    
+    # Include steps with truncation
+    steps = get('steps')
+    if steps:
+        detailed_case['steps'] = _truncate_steps(steps, max_step_depth)
+    
+    return detailed_case
+
+
+def _create_detailed(result: Dict[str, Any], max_tests: int = 50, max_step_depth: int = 2) -> Dict[str, Any]:
+    """Create detailed view with truncation limits"""
+    test_suites = result.get('test-suites', [])
+    
+    detailed_suites = []
+    test_count = 0
+    
+    for suite in test_suites:
+        if test_count >= max_tests:
+            break
+            
+        # Only as many cases as the remaining test budget allows
+        detailed_cases = [
+            _detailed_case(tc, max_step_depth)
+            for tc in suite.get('test-cases', [])[:max_tests - test_count]
+        ]
+        test_count += len(detailed_cases)
+        
+        if detailed_cases:
+            detailed_suites.append({
+                'name': suite.get('name', ''),
+                'status': suite.get('status', ''),
+                'test-cases': detailed_cases
+            })
+    
+    return {
+        'note': f'Showing {test_count} tests (max {max_tests}), step depth limited to {max_step_depth}',
+        'test-suites': detailed_suites
+    }
+
+
+def render_output(
+    result: Dict[str, Any],
+    mode: str = "summary",
+    status_filter: Optional[str] = None,
+    max_tests: int = 50,
+    max_step_depth: int = 2
+) -> Dict[str, Any]:
+    """
+    Build the view of a parsed result for the given output mode
+    
+    max_tests and max_step_depth bound the detailed view. Unknown modes
+    fall back to summary. The returned dict is always a new object, so
+    callers may add keys without touching the parsed result.
+    """
+    if mode == "compact":
+        return _create_compact(result, include_passed=(status_filter == 'passed'))
+    if mode == "detailed":
+        return _create_detailed(result, max_tests, max_step_depth)
+    if mode == "full":
+        return dict(result)  # Shallow copy: the parsed result may be cached and shared
+    return _create_summary(result)
@@ -5,21 +5,34 @@ Provides token-based authentication and common Jira operations.
 
 import os
 import requests
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List, Iterator
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import base64
 
+from json_compat import dumps_bytes
+
+# Fields returned by search_issues when the caller does not ask for specific ones
+_DEFAULT_SEARCH_FIELDS = 'summary,status,priority,assignee,created,updated'
+
+# Keep-alive connections kept per host, enough for concurrent tool calls
+_POOL_SIZE = 20
+
 
-@dataclass
 class JiraConfig:
     """Jira configuration from environment variables."""
-    base_url: str
-    email: str
-    api_token: str
+    __slots__ = ('base_url', 'email', 'api_token')
+    
+    def __init__(self, base_url: str, email: str, api_token: str):
+        self.base_url = base_url
+        self.email = email
+        self.api_token = api_token
     
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def from_env(cls) -> 'JiraConfig':
-        """Create config from environment variables."""
+        """Create config from environment variables (read once, then cached)."""
         base_url = os.environ.get('JIRA_BASE_URL', '').rstrip('/')
         email = os.environ.get('JIRA_EMAIL', '')
         api_token = os.environ.get('JIRA_API_TOKEN', '')
@@ -37,6 +50,25 @@ class JiraConfig:
         return cls(base_url=base_url, email=email, api_token=api_token)
 
 
+@functools.lru_cache(maxsize=8)
+def _basic_auth_header(email: str, api_token: str) -> str:
+    """Build the Basic auth header value; Jira Cloud uses email:api_token."""
+    auth_bytes = base64.b64encode(f"{email}:{api_token}".encode('utf-8')).decode('utf-8')
+    return f'Basic {auth_bytes}'
+
+
+def _adf_doc(text: str) -> Dict[str, Any]:
+    """Wrap plain text in a single-paragraph Atlassian Document Format (ADF) doc."""
+    return {
+        "type": "doc",
+        "version": 1,
+        "content": [{
+            "type": "paragraph",
+            "content": [{"type": "text", "text": text}]
+        }]
+    }
+
+
 class JiraClient:
     """Jira REST API client with token authentication."""
     
@@ -44,15 +76,15 @@ class JiraClient:
         """Initialize Jira client with config or environment variables."""
         self.config = config or JiraConfig.from_env()
         self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
         self._setup_auth()
     
     def _setup_auth(self):
         """Setup Basic authentication with API token."""
-        # Jira Cloud uses Basic Auth with email:api_token
-        auth_string = f"{self.config.email}:{self.config.api_token}"
-        auth_bytes = base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')
         self._session.headers.update({
-            'Authorization': f'Basic {auth_bytes}',
+            'Authorization': _basic_auth_header(self.config.email, self.config.api_token),
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
@@ -87,11 +119,11 @@ class JiraClient:
     
     def post(self, endpoint: str, data: Dict) -> Dict[str, Any]:
         """POST request to Jira API."""
-        return self._request('POST', endpoint, json=data)
+        return self._request('POST', endpoint, data=dumps_bytes(data))
     
     def put(self, endpoint: str, data: Dict) -> Dict[str, Any]:
         """PUT request to Jira API."""
-        return self._request('PUT', endpoint, json=data)
+        return self._request('PUT', endpoint, data=dumps_bytes(data))
     
     # ==================== High-Level Operations ====================
     
@@ -112,7 +144,13 @@ class JiraClient:
             params['fields'] = ','.join(fields)
         return self.get(f'issue/{issue_key}', params=params)
     
-    def search_issues(self, jql: str, max_results: int = 50, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    def search_issues(
+        self,
+        jql: str,
+        max_results: int = 50,
+        fields: Optional[List[str]] = None,
+        next_page_token: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Search issues using JQL.
         
@@ -120,16 +158,53 @@ class JiraClient:
             jql: JQL query string
             max_results: Maximum number of results (default 50)
             fields: Optional list of fields to return
+            next_page_token: Token from a previous page to continue from
         """
         # Use the new /search/jql endpoint (migrated from deprecated /search)
         # See: https://developer.atlassian.com/changelog/#CHANGE-2046
         params = {
             'jql': jql,
             'maxResults': max_results,
-            'fields': ','.join(fields or ['summary', 'status', 'priority', 'assignee', 'created', 'updated'])
+            'fields': ','.join(fields) if fields else _DEFAULT_SEARCH_FIELDS
         }
+        if next_page_token:
+            params['nextPageToken'] = next_page_token
         return self.get('search/jql', params=params)
     
+    def search_issues_all(
+        self,
+        jql: str,
+        page_size: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every issue matching a JQL query.
+        
+        The next page is fetched in the background while the caller
+        consumes the current one, so page latency overlaps with processing.
+        
+        Args:
+            jql: JQL query string
+            page_size: Issues requested per page (default 100)
+            fields: Optional list of fields to return
+        
+        Yields:
+            Issue data in search order
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = self.search_issues(jql, max_results=page_size, fields=fields)
+            while True:
+                token = page.get('nextPageToken')
+                next_page = None
+                if token and not page.get('isLast', False):
+                    next_page = executor.submit(self.search_issues, jql, page_size, fields, token)
+                
+                yield from page.get('issues', [])
+                
+                if next_page is None:
+                    return
+                page = next_page.result()
+    
     def create_issue(
         self,
         project_key: str,
@@ -157,27 +232,10 @@ class JiraClient:
         Returns:
             Created issue data including key
         """
-        # Build description in Atlassian Document Format (ADF)
-        description_content = {
-            "type": "doc",
-            "version": 1,
-            "content": [
-                {
-                    "type": "paragraph",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": description
-                        }
-                    ]
-                }
-            ]
-        }
-        
         fields = {
             'project': {'key': project_key},
             'summary': summary,
-            'description': description_content,
+            'description': _adf_doc(description),
             'issuetype': {'name': issue_type}
         }
         
@@ -203,24 +261,7 @@ class JiraClient:
             issue_key: Issue key (e.g., 'PROJ-123')
             comment: Comment text
         """
-        body = {
-            "body": {
-                "type": "doc",
-                "version": 1,
-                "content": [
-                    {
-                        "type": "paragraph",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": comment
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
-        return self.post(f'issue/{issue_key}/comment', body)
+        return self.post(f'issue/{issue_key}/comment', {'body': _adf_doc(comment)})
     
     def get_transitions(self, issue_key: str) -> Dict[str, Any]:
         """Get available transitions for an issue."""
@@ -242,18 +283,11 @@ class JiraClient:
             data['update'] = {
                 'comment': [{
                     'add': {
-                        'body': {
-                            "type": "doc",
-                            "version": 1,
-                            "content": [{
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": comment}]
-                            }]
-                        }
+                        'body': _adf_doc(comment)
                     }
                 }]
             }
-        return self._request('POST', f'issue/{issue_key}/transitions', json=data)
+        return self.post(f'issue/{issue_key}/transitions', data)
     
     def get_projects(self) -> List[Dict[str, Any]]:
         """Get list of accessible projects."""
@@ -273,23 +307,17 @@ class JiraAPIError(Exception):
         self.status_code = status_code
 
 
-# Singleton instance for easy access
-_client: Optional[JiraClient] = None
-
-
+@functools.lru_cache(maxsize=1)
 def get_jira_client() -> JiraClient:
     """Get or create Jira client singleton."""
-    global _client
-    if _client is None:
-        _client = JiraClient()
-    return _client
+    return JiraClient()
 
 
 def is_jira_configured() -> bool:
-    """Check if Jira environment variables are configured."""
-    return all([
-        os.environ.get('JIRA_BASE_URL'),
-        os.environ.get('JIRA_EMAIL'),
-        os.environ.get('JIRA_API_TOKEN')
-    ])
+    """Check if Jira environment variables are configured (same check and cache as JiraConfig.from_env)."""
+    try:
+        JiraConfig.from_env()
+    except ValueError:
+        return False
+    return True
 
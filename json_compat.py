@@ -0,0 +1,33 @@
+"""JSON encoding and decoding shared by the parser, the MCP server and the Jira client"""
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speedup (the 'speedups' extra), stdlib json is used when unavailable
+    orjson = None
+
+
+# Both decoders accept raw bytes, so files can be read in binary mode and
+# the separate UTF-8 decode pass of text-mode IO is skipped
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def dumps_bytes(obj: Any, default: Optional[Callable[[Any], Any]] = None, ensure_ascii: bool = False) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes (non-ASCII kept as-is)
+    
+    With ensure_ascii=True the stdlib fallback \\u-escapes non-ASCII text instead:
+    the C encoder stays on its ASCII fast path and the bytes conversion is
+    a plain copy. orjson output is UTF-8 either way.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=default)
+    if ensure_ascii:
+        return json.dumps(obj, ensure_ascii=True, separators=(',', ':'), default=default).encode('ascii')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=default).encode('utf-8')
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialize to compact JSON text (non-ASCII kept as-is)"""
+    return dumps_bytes(obj, default).decode('utf-8')
@@ -1,175 +1,113 @@
 import asyncio
+import os
+import threading
+import time
+from functools import lru_cache, wraps
 from mcp.server import FastMCP
-from allure_html import create_allure_parser, detect_allure_directory_type
+from allure_html import create_allure_parser
+from allure_views import FAIL_STATUSES, compact_case, render_output
 import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 from jira_client import (
     JiraClient, JiraConfig, JiraAPIError, 
     get_jira_client, is_jira_configured
 )
+from json_compat import dumps as _dumps, dumps_bytes as _dumps_bytes
 
 MCP_SERVER_NAME = "mcp-allure-server"
 mcp = FastMCP(MCP_SERVER_NAME)
 # mcp.start()
 
+# Full mode responses above this many bytes fall back to a truncated detailed view.
+# The limit applies to the compact UTF-8 payload actually returned, not to
+# json.dumps() text with ', '/': ' separators and \u escapes as it once did,
+# so about 11% more ASCII content fits under it and about twice as much CJK.
+_FULL_MODE_LIMIT = 50000
 
-def _create_summary(result: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a summary view with statistics only (most compact)"""
-    test_suites = result.get('test-suites', [])
-    
-    total_tests = 0
-    status_counts = {'passed': 0, 'failed': 0, 'broken': 0, 'skipped': 0, 'unknown': 0}
-    failed_tests = []
-    
-    for suite in test_suites:
-        for tc in suite.get('test-cases', []):
-            total_tests += 1
-            status = tc.get('status', 'unknown')
-            if status in status_counts:
-                status_counts[status] += 1
-            else:
-                status_counts['unknown'] += 1
-            
-            # Collect failed/broken tests for quick reference
-            if status in ('failed', 'broken'):
-                failed_tests.append({
-                    'suite': suite.get('name', ''),
-                    'name': tc.get('title', tc.get('name', '')),
-                    'status': status
-                })
-    
-    pass_rate = (status_counts['passed'] / total_tests * 100) if total_tests > 0 else 0
-    
-    return {
-        'summary': {
-            'total_suites': len(test_suites),
-            'total_tests': total_tests,
-            'passed': status_counts['passed'],
-            'failed': status_counts['failed'],
-            'broken': status_counts['broken'],
-            'skipped': status_counts['skipped'],
-            'pass_rate': f"{pass_rate:.1f}%"
-        },
-        'failed_tests': failed_tests[:20],  # Limit to 20 failed tests
-        'suites': [{'name': s.get('name', ''), 'status': s.get('status', ''), 'test_count': len(s.get('test-cases', []))} for s in test_suites]
-    }
 
+# Parsed reports reused across tool calls without any filesystem check
+_SESSION_TTL = 60.0
+_session: Dict[Tuple[str, Optional[str]], Tuple[float, Tuple[str, Dict[str, Any]]]] = {}
+_session_lock = threading.Lock()
 
-def _create_compact(result: Dict[str, Any], include_passed: bool = False) -> Dict[str, Any]:
-    """Create a compact view focusing on failures with minimal details"""
-    test_suites = result.get('test-suites', [])
-    
-    compact_suites = []
-    total_passed = 0
-    total_failed = 0
-    
-    for suite in test_suites:
-        compact_cases = []
-        for tc in suite.get('test-cases', []):
-            status = tc.get('status', '')
-            
-            if status == 'passed':
-                total_passed += 1
-                if not include_passed:
-                    continue  # Skip passed tests in compact mode
-            else:
-                total_failed += 1
-            
-            # Minimal test case info
-            compact_case = {
-                'name': tc.get('title', tc.get('name', '')),
-                'status': status,
-            }
-            
-            # Only add steps summary for non-passed tests
-            if status != 'passed':
-                steps = tc.get('steps', [])
-                if steps:
-                    # Only include failed steps
-                    failed_steps = [s.get('name', '') for s in steps if s.get('status') != 'passed']
-                    if failed_steps:
-                        compact_case['failed_steps'] = failed_steps[:5]  # Limit to 5
-            
-            compact_cases.append(compact_case)
-        
-        if compact_cases:
-            compact_suites.append({
-                'name': suite.get('name', ''),
-                'status': suite.get('status', ''),
-                'test-cases': compact_cases
-            })
+
+def _results_signature(path: str) -> Tuple[int, int]:
+    """
+    Return (newest mtime in ns, file count) over all JSON files below path
     
-    return {
-        'overview': {
-            'total_passed': total_passed,
-            'total_failed': total_failed,
-            'showing': 'failed_only' if not include_passed else 'all'
-        },
-        'test-suites': compact_suites
-    }
+    Symlinks are neither followed nor resolved: a link counts with its own
+    mtime, so dangling links and links back up the tree are harmless.
+    """
+    newest = 0
+    count = 0
+    pending = [path]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith('.json'):
+                    newest = max(newest, entry.stat(follow_symlinks=False).st_mtime_ns)
+                    count += 1
+    return newest, count
 
 
-def _create_detailed(result: Dict[str, Any], max_tests: int = 50, max_step_depth: int = 2) -> Dict[str, Any]:
-    """Create detailed view with truncation limits"""
-    test_suites = result.get('test-suites', [])
-    
-    def truncate_steps(steps: List[Dict], depth: int = 0) -> List[Dict]:
-        """Recursively truncate steps to max depth"""
-        if depth >= max_step_depth or not steps:
-            return []
-        
-        truncated = []
-        for step in steps[:10]:  # Max 10 steps per level
-            truncated_step = {
-                'name': step.get('name', ''),
-                'status': step.get('status', ''),
-            }
-            if depth < max_step_depth - 1 and step.get('steps'):
-                truncated_step['steps'] = truncate_steps(step.get('steps', []), depth + 1)
-            truncated.append(truncated_step)
-        
-        if len(steps) > 10:
-            truncated.append({'name': f'... and {len(steps) - 10} more steps', 'status': 'truncated'})
-        
-        return truncated
-    
-    detailed_suites = []
-    test_count = 0
+@lru_cache(maxsize=8)
+def _cached_parse(results_dir: str, status_filter: Optional[str], signature: Tuple[int, int]) -> Tuple[str, Dict[str, Any]]:
+    """Parse a report; the signature argument only keys the cache"""
+    return _parse_uncached(results_dir, status_filter)
+
+
+def _parse_uncached(results_dir: str, status_filter: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+    """Return (directory type, parsed result) from a single detection pass"""
+    parser = create_allure_parser(results_dir, testcase_status=status_filter)
+    if parser.directory_type == 'results':
+        # Parses run in asyncio.to_thread workers; forking a process pool from
+        # this multi-threaded server can deadlock, so stay on threads
+        return parser.directory_type, parser.parse(parallel=False)
+    return parser.directory_type, parser.parse()
+
+
+def _parse_report(results_dir: str, status_filter: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parse an allure directory, memoized on its contents.
     
-    for suite in test_suites:
-        if test_count >= max_tests:
-            break
-            
-        detailed_cases = []
-        for tc in suite.get('test-cases', []):
-            if test_count >= max_tests:
-                break
-            
-            detailed_case = {
-                'name': tc.get('name', ''),
-                'title': tc.get('title', ''),
-                'status': tc.get('status', ''),
-                'severity': tc.get('severity', 'normal'),
-            }
-            
-            # Include steps with truncation
-            if tc.get('steps'):
-                detailed_case['steps'] = truncate_steps(tc.get('steps', []))
-            
-            detailed_cases.append(detailed_case)
-            test_count += 1
-        
-        if detailed_cases:
-            detailed_suites.append({
-                'name': suite.get('name', ''),
-                'status': suite.get('status', ''),
-                'test-cases': detailed_cases
-            })
+    Adding, removing or rewriting a JSON file normally changes the
+    signature. Replacing a file with one carrying an older mtime (cp -p,
+    rsync -a) with the same file count does not, so a stale result can be
+    returned until the cache entry is evicted. Callers must not mutate the
+    result.
+    """
+    try:
+        signature = _results_signature(results_dir)
+    except OSError:
+        # Let the parser report unusable paths with its own error message
+        return _parse_uncached(results_dir, status_filter)
+    return _cached_parse(results_dir, status_filter, signature)
+
+
+def _get_parsed(results_dir: str, status_filter: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Session-level parse shared by all tools.
     
-    return {
-        'note': f'Showing {test_count} tests (max {max_tests}), step depth limited to {max_step_depth}',
-        'test-suites': detailed_suites
-    }
+    A directory parsed within the last _SESSION_TTL seconds is returned
+    without rescanning it, so chained tool calls on the same report skip
+    even the signature check. Older entries fall through to _parse_report.
+    """
+    key = (results_dir, status_filter)
+    now = time.monotonic()
+    with _session_lock:
+        entry = _session.get(key)
+    if entry is not None and now - entry[0] < _SESSION_TTL:
+        return entry[1]
+    
+    parsed = _parse_report(results_dir, status_filter)
+    with _session_lock:
+        # Drop expired entries so the session stays bounded by recent use
+        for stale in [k for k, (stamp, _) in _session.items() if now - stamp >= _SESSION_TTL]:
+            del _session[stale]
+        _session[key] = (now, parsed)
+    return parsed
 
 
 @mcp.tool()
@@ -186,41 +124,107 @@ async def analyze_allure_report(results_dir: str, mode: str = "summary", status_
     Returns:
         JSON string with structured test suite data
     """
+    # Parsing and serialization block; run them off the event loop so other tools stay responsive
+    return await asyncio.to_thread(_analyze_report, results_dir, mode, status_filter)
+
+
+def _iter_json_fragments(output: Dict[str, Any]) -> Iterable[bytes]:
+    """Yield the compact JSON encoding of output piece by piece, one fragment per suite"""
+    separator = b'{'
+    for key, value in output.items():
+        yield separator + _dumps_bytes(key) + b':'
+        separator = b','
+        if key == 'test-suites' and value:
+            yield b'['
+            suite_separator = b''
+            for suite in value:
+                yield suite_separator + _dumps_bytes(suite)
+                suite_separator = b','
+            yield b']'
+        else:
+            yield _dumps_bytes(value)
+    yield b'{}' if separator == b'{' else b'}'
+
+
+def _dumps_bytes_bounded(output: Dict[str, Any], limit: int) -> Optional[bytes]:
+    """Serialize like _dumps_bytes, or return None as soon as the size exceeds limit"""
+    fragments = []
+    size = 0
+    for fragment in _iter_json_fragments(output):
+        size += len(fragment)
+        if size > limit:
+            return None
+        fragments.append(fragment)
+    return b''.join(fragments)
+
+
+def _full_size_lower_bound(result: Dict[str, Any]) -> int:
+    """
+    Cheap lower bound on the compact JSON size of a parsed result.
+    
+    Each case field encodes as at least '"key":v,' (key length + 4 bytes),
+    and string name/title values add at least one byte per character.
+    Nested values such as steps are not inspected.
+    """
+    total = 0
+    for suite in result.get('test-suites', []):
+        for tc in suite.get('test-cases', []):
+            total += sum(map(len, tc)) + 4 * len(tc)
+            name = tc.get('name')
+            title = tc.get('title')
+            if isinstance(name, str):
+                total += len(name)
+            if isinstance(title, str):
+                total += len(title)
+    return total
+
+
+@lru_cache(maxsize=64)
+def _metadata(results_dir: str, mode: str, status_filter: Optional[str], dir_type: str) -> Dict[str, Any]:
+    """
+    Response metadata block, shared between responses with the same arguments.
+    
+    The returned dict is cached and must be treated as read-only.
+    """
+    return {
+        'source_type': dir_type,
+        'source_path': results_dir,
+        'mode': mode,
+        'status_filter': status_filter
+    }
+
+
+def _analyze_report(results_dir: str, mode: str, status_filter: Optional[str]) -> str:
+    """Synchronous body of analyze_allure_report"""
     try:
-        # Auto-detect and create appropriate parser
-        parser = create_allure_parser(results_dir, testcase_status=status_filter if mode != 'summary' else None)
-        result = parser.parse()
+        # Auto-detect and parse, reusing the last result if nothing changed
+        dir_type, result = _get_parsed(results_dir, status_filter if mode != 'summary' else None)
         
-        # Add metadata about source type
-        dir_type = detect_allure_directory_type(results_dir)
+        # Process based on mode; full mode's size limit is checked on the serialized payload below
+        output = render_output(result, mode, status_filter)
         
-        # Process based on mode
-        if mode == "summary":
-            output = _create_summary(result)
-        elif mode == "compact":
-            output = _create_compact(result, include_passed=(status_filter == 'passed'))
-        elif mode == "detailed":
-            output = _create_detailed(result)
-        elif mode == "full":
-            # Full mode - but still apply some limits
-            output = result
-            if len(json.dumps(output)) > 50000:  # If too large, warn and truncate
-                output = _create_detailed(result, max_tests=100, max_step_depth=3)
-                output['warning'] = 'Response truncated due to size. Use mode="compact" or mode="summary" for large test suites.'
-        else:
-            output = _create_summary(result)  # Default to summary
+        metadata = _metadata(results_dir, mode, status_filter, dir_type)
+        output['_metadata'] = metadata
+        
+        if mode != "full":
+            # Use compact JSON (no indent) to reduce size
+            return _dumps_bytes(output).decode('utf-8')
         
-        output['_metadata'] = {
-            'source_type': dir_type,
-            'source_path': results_dir,
-            'mode': mode,
-            'status_filter': status_filter
-        }
+        # Full mode still applies some limits: serialization stops as soon as
+        # the payload passes the limit instead of encoding the whole report
+        if _full_size_lower_bound(result) > _FULL_MODE_LIMIT:
+            payload = None  # Certain to be too large; skip serialization entirely
+        else:
+            payload = _dumps_bytes_bounded(output, _FULL_MODE_LIMIT)
+        if payload is None:  # If too large, warn and truncate
+            output = render_output(result, "detailed", max_tests=100, max_step_depth=3)
+            output['warning'] = 'Response truncated due to size. Use mode="compact" or mode="summary" for large test suites.'
+            output['_metadata'] = metadata
+            payload = _dumps_bytes(output)
         
-        # Use compact JSON (no indent) to reduce size
-        return json.dumps(output, ensure_ascii=False, separators=(',', ':'))
+        return payload.decode('utf-8')
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": str(e),
             "path": results_dir
         })
@@ -228,6 +232,13 @@ async def analyze_allure_report(results_dir: str, mode: str = "summary", status_
 
 # ==================== Jira Integration Tools ====================
 
+# JiraClient is synchronous (requests with a pooled session); each call is
+# awaited through asyncio.to_thread so slow Jira responses never block the
+# event loop and concurrent tool calls share the session's connection pool.
+
+# Maximum Jira requests in flight for batched tools
+_JIRA_CONCURRENCY = 5
+
 def _check_jira_configured() -> Optional[str]:
     """Check if Jira is configured, return error message if not."""
     if not is_jira_configured():
@@ -238,7 +249,28 @@ def _check_jira_configured() -> Optional[str]:
     return None
 
 
+def _jira_tool(fn):
+    """
+    Wrap a Jira tool with the shared configuration check and error handling.
+    
+    Unconfigured Jira returns the setup hint; JiraAPIError and any other
+    exception are reported as JSON instead of propagating to the client.
+    """
+    @wraps(fn)
+    async def wrapper(*args, **kwargs) -> str:
+        if error := _check_jira_configured():
+            return error
+        try:
+            return await fn(*args, **kwargs)
+        except JiraAPIError as e:
+            return _dumps({"error": str(e), "status_code": e.status_code})
+        except Exception as e:
+            return _dumps({"error": str(e)})
+    return wrapper
+
+
 @mcp.tool()
+@_jira_tool
 async def jira_test_connection() -> str:
     """
     Test Jira connection and return current user info.
@@ -247,29 +279,22 @@ async def jira_test_connection() -> str:
     Returns:
         JSON with current user information or error message
     """
-    if error := _check_jira_configured():
-        return error
-    
-    try:
-        client = get_jira_client()
-        user_info = client.test_connection()
-        return json.dumps({
-            "status": "connected",
-            "user": {
-                "displayName": user_info.get('displayName'),
-                "emailAddress": user_info.get('emailAddress'),
-                "accountId": user_info.get('accountId'),
-                "active": user_info.get('active')
-            },
-            "jira_url": client.config.base_url
-        }, ensure_ascii=False)
-    except JiraAPIError as e:
-        return json.dumps({"error": str(e), "status_code": e.status_code})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    client = get_jira_client()
+    user_info = await asyncio.to_thread(client.test_connection)
+    return json.dumps({
+        "status": "connected",
+        "user": {
+            "displayName": user_info.get('displayName'),
+            "emailAddress": user_info.get('emailAddress'),
+            "accountId": user_info.get('accountId'),
+            "active": user_info.get('active')
+        },
+        "jira_url": client.config.base_url
+    }, ensure_ascii=False)
 
 
 @mcp.tool()
+@_jira_tool
 async def jira_get_issue(issue_key: str) -> str:
     """
     Get Jira issue details by key.
@@ -280,35 +305,28 @@ async def jira_get_issue(issue_key: str) -> str:
     Returns:
         JSON with issue details including summary, status, description, assignee, etc.
     """
-    if error := _check_jira_configured():
-        return error
-    
-    try:
-        client = get_jira_client()
-        issue = client.get_issue(issue_key)
-        
-        fields = issue.get('fields', {})
-        return json.dumps({
-            "key": issue.get('key'),
-            "summary": fields.get('summary'),
-            "status": fields.get('status', {}).get('name'),
-            "priority": fields.get('priority', {}).get('name'),
-            "assignee": fields.get('assignee', {}).get('displayName') if fields.get('assignee') else None,
-            "reporter": fields.get('reporter', {}).get('displayName') if fields.get('reporter') else None,
-            "created": fields.get('created'),
-            "updated": fields.get('updated'),
-            "labels": fields.get('labels', []),
-            "issue_type": fields.get('issuetype', {}).get('name'),
-            "project": fields.get('project', {}).get('key'),
-            "url": f"{client.config.base_url}/browse/{issue.get('key')}"
-        }, ensure_ascii=False)
-    except JiraAPIError as e:
-        return json.dumps({"error": str(e), "status_code": e.status_code})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    client = get_jira_client()
+    issue = await asyncio.to_thread(client.get_issue, issue_key)
+    
+    fields = issue.get('fields', {})
+    return json.dumps({
+        "key": issue.get('key'),
+        "summary": fields.get('summary'),
+        "status": fields.get('status', {}).get('name'),
+        "priority": fields.get('priority', {}).get('name'),
+        "assignee": fields.get('assignee', {}).get('displayName') if fields.get('assignee') else None,
+        "reporter": fields.get('reporter', {}).get('displayName') if fields.get('reporter') else None,
+        "created": fields.get('created'),
+        "updated": fields.get('updated'),
+        "labels": fields.get('labels', []),
+        "issue_type": fields.get('issuetype', {}).get('name'),
+        "project": fields.get('project', {}).get('key'),
+        "url": f"{client.config.base_url}/browse/{issue.get('key')}"
+    }, ensure_ascii=False)
 
 
 @mcp.tool()
+@_jira_tool
 async def jira_search(jql: str, max_results: int = 20) -> str:
     """
     Search Jira issues using JQL (Jira Query Language).
@@ -320,39 +338,32 @@ async def jira_search(jql: str, max_results: int = 20) -> str:
     Returns:
         JSON with list of matching issues
     """
-    if error := _check_jira_configured():
-        return error
+    client = get_jira_client()
+    max_results = min(max_results, 50)  # Cap at 50
     
-    try:
-        client = get_jira_client()
-        max_results = min(max_results, 50)  # Cap at 50
-        
-        result = client.search_issues(jql, max_results=max_results)
-        
-        issues = []
-        for issue in result.get('issues', []):
-            fields = issue.get('fields', {})
-            issues.append({
-                "key": issue.get('key'),
-                "summary": fields.get('summary'),
-                "status": fields.get('status', {}).get('name'),
-                "priority": fields.get('priority', {}).get('name'),
-                "assignee": fields.get('assignee', {}).get('displayName') if fields.get('assignee') else None,
-                "updated": fields.get('updated')
-            })
-        
-        return json.dumps({
-            "total": result.get('total'),
-            "returned": len(issues),
-            "issues": issues
-        }, ensure_ascii=False)
-    except JiraAPIError as e:
-        return json.dumps({"error": str(e), "status_code": e.status_code})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    result = await asyncio.to_thread(client.search_issues, jql, max_results=max_results)
+    
+    issues = []
+    for issue in result.get('issues', []):
+        fields = issue.get('fields', {})
+        issues.append({
+            "key": issue.get('key'),
+            "summary": fields.get('summary'),
+            "status": fields.get('status', {}).get('name'),
+            "priority": fields.get('priority', {}).get('name'),
+            "assignee": fields.get('assignee', {}).get('displayName') if fields.get('assignee') else None,
+            "updated": fields.get('updated')
+        })
+    
+    return json.dumps({
+        "total": result.get('total'),
+        "returned": len(issues),
+        "issues": issues
+    }, ensure_ascii=False)
 
 
 @mcp.tool()
+@_jira_tool
 async def jira_create_issue(
     project_key: str,
     summary: str,
@@ -375,34 +386,28 @@ async def jira_create_issue(
     Returns:
         JSON with created issue key and URL
     """
-    if error := _check_jira_configured():
-        return error
-    
-    try:
-        client = get_jira_client()
-        result = client.create_issue(
-            project_key=project_key,
-            summary=summary,
-            description=description,
-            issue_type=issue_type,
-            priority=priority,
-            labels=labels
-        )
-        
-        issue_key = result.get('key')
-        return json.dumps({
-            "status": "created",
-            "key": issue_key,
-            "id": result.get('id'),
-            "url": f"{client.config.base_url}/browse/{issue_key}"
-        }, ensure_ascii=False)
-    except JiraAPIError as e:
-        return json.dumps({"error": str(e), "status_code": e.status_code})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    client = get_jira_client()
+    result = await asyncio.to_thread(
+        client.create_issue,
+        project_key=project_key,
+        summary=summary,
+        description=description,
+        issue_type=issue_type,
+        priority=priority,
+        labels=labels
+    )
+    
+    issue_key = result.get('key')
+    return json.dumps({
+        "status": "created",
+        "key": issue_key,
+        "id": result.get('id'),
+        "url": f"{client.config.base_url}/browse/{issue_key}"
+    }, ensure_ascii=False)
 
 
 @mcp.tool()
+@_jira_tool
 async def jira_add_comment(issue_key: str, comment: str) -> str:
     """
     Add a comment to a Jira issue.
@@ -414,26 +419,84 @@ async def jira_add_comment(issue_key: str, comment: str) -> str:
     Returns:
         JSON with status and comment ID
     """
-    if error := _check_jira_configured():
-        return error
-    
-    try:
-        client = get_jira_client()
-        result = client.add_comment(issue_key, comment)
-        
-        return json.dumps({
-            "status": "comment_added",
-            "issue_key": issue_key,
-            "comment_id": result.get('id'),
-            "created": result.get('created')
-        }, ensure_ascii=False)
-    except JiraAPIError as e:
-        return json.dumps({"error": str(e), "status_code": e.status_code})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    client = get_jira_client()
+    result = await asyncio.to_thread(client.add_comment, issue_key, comment)
+    
+    return json.dumps({
+        "status": "comment_added",
+        "issue_key": issue_key,
+        "comment_id": result.get('id'),
+        "created": result.get('created')
+    }, ensure_ascii=False)
+
+
+_BUG_TEMPLATE = (
+    "**Test Suite:** {suite}\n"
+    "**Test Name:** {name}\n"
+    "\n"
+    "**Error Message:**\n"
+    "```\n{error}\n```"
+    "{steps_block}\n"
+    "\n"
+    "---\n"
+    "_This bug was created from automated test failure._"
+)
+
+
+# Longest stack trace quoted in a bug filed from a report (Jira caps
+# descriptions at 32 767 characters)
+_BUG_TRACE_LIMIT = 4000
+
+
+def _failure_details(tc: Dict[str, Any]) -> str:
+    """Error text for a bug filed from a parsed test case: its failure message and stack trace"""
+    message = tc.get('status-message') or f"Test finished with status '{tc.get('status', '')}'"
+    trace = tc.get('status-trace')
+    if not trace:
+        return message
+    if len(trace) > _BUG_TRACE_LIMIT:
+        trace = trace[:_BUG_TRACE_LIMIT] + "\n..."
+    return f"{message}\n\n{trace}"
+
+
+def _open_test_failure_issues(client: JiraClient, project_key: str) -> Dict[str, str]:
+    """Map summary -> key of the unresolved 'test-failure' issues in a project"""
+    jql = f'project = "{project_key}" AND labels = "test-failure" AND statusCategory != Done'
+    return {
+        issue.get('fields', {}).get('summary'): issue.get('key')
+        for issue in client.search_issues_all(jql, fields=['summary'])
+    }
+
+
+def _format_test_failure_bug(
+    test_name: str,
+    test_suite: str,
+    error_message: str,
+    steps_to_reproduce: Optional[str] = None,
+    labels: Optional[List[str]] = None
+) -> Tuple[str, str, List[str]]:
+    """Build (summary, description, labels) for a bug filed from a test failure"""
+    # Build descriptive summary
+    summary = f"[Test Failure] {test_suite}: {test_name}"
+    if len(summary) > 255:
+        summary = summary[:252] + "..."
+    
+    # Build detailed description
+    steps_block = f"\n\n**Steps/Context:**\n{steps_to_reproduce}" if steps_to_reproduce else ""
+    description = _BUG_TEMPLATE.format(
+        suite=test_suite, name=test_name, error=error_message, steps_block=steps_block
+    )
+    
+    # Ensure 'test-failure' label is included
+    all_labels = list(labels) if labels else []
+    if 'test-failure' not in all_labels:
+        all_labels.append('test-failure')
+    
+    return summary, description, all_labels
 
 
 @mcp.tool()
+@_jira_tool
 async def jira_create_bug_from_test_failure(
     project_key: str,
     test_name: str,
@@ -458,70 +521,143 @@ async def jira_create_bug_from_test_failure(
     Returns:
         JSON with created issue key and URL
     """
-    if error := _check_jira_configured():
-        return error
+    client = get_jira_client()
+    summary, description, all_labels = _format_test_failure_bug(
+        test_name, test_suite, error_message, steps_to_reproduce, labels
+    )
+    
+    result = await asyncio.to_thread(
+        client.create_issue,
+        project_key=project_key,
+        summary=summary,
+        description=description,
+        issue_type="Bug",
+        priority=priority,
+        labels=all_labels
+    )
+    
+    issue_key = result.get('key')
+    return json.dumps({
+        "status": "bug_created",
+        "key": issue_key,
+        "id": result.get('id'),
+        "url": f"{client.config.base_url}/browse/{issue_key}",
+        "summary": summary
+    }, ensure_ascii=False)
+
+
+@mcp.tool()
+@_jira_tool
+async def jira_create_bugs_from_allure_failures(
+    results_dir: str,
+    project_key: str,
+    priority: str = "High",
+    labels: List[str] = None,
+    max_bugs: int = 20
+) -> str:
+    """
+    Create one Jira bug per failed or broken test in an allure report, in parallel.
+    Tests that already have an unresolved 'test-failure' issue with the same
+    summary in the project are skipped, so repeated calls do not file duplicates.
     
-    try:
-        client = get_jira_client()
-        
-        # Build descriptive summary
-        summary = f"[Test Failure] {test_suite}: {test_name}"
-        if len(summary) > 255:
-            summary = summary[:252] + "..."
-        
-        # Build detailed description
-        description_parts = [
-            f"**Test Suite:** {test_suite}",
-            f"**Test Name:** {test_name}",
-            "",
-            "**Error Message:**",
-            f"```\n{error_message}\n```"
-        ]
-        
-        if steps_to_reproduce:
-            description_parts.extend([
-                "",
-                "**Steps/Context:**",
-                steps_to_reproduce
-            ])
-        
-        description_parts.extend([
-            "",
-            "---",
-            "_This bug was created from automated test failure._"
-        ])
-        
-        description = "\n".join(description_parts)
-        
-        # Ensure 'test-failure' label is included
-        all_labels = list(labels) if labels else []
-        if 'test-failure' not in all_labels:
-            all_labels.append('test-failure')
-        
-        result = client.create_issue(
-            project_key=project_key,
-            summary=summary,
-            description=description,
-            issue_type="Bug",
-            priority=priority,
-            labels=all_labels
+    Args:
+        results_dir: Path to allure-report or allure-results directory
+        project_key: Project key (e.g., 'PROJ')
+        priority: Bug priority (default 'High')
+        labels: Additional labels (will add 'test-failure' automatically)
+        max_bugs: Maximum number of bugs to create (default 20)
+    
+    Returns:
+        JSON with created issue keys, skipped tests with their existing issues, and per-test errors
+    """
+    _, result = await asyncio.to_thread(_get_parsed, results_dir)
+    failures = [
+        (suite.get('name', ''), tc)
+        for suite in result.get('test-suites', [])
+        for tc in suite.get('test-cases', [])
+        if tc.get('status') in FAIL_STATUSES
+    ]
+    
+    client = get_jira_client()
+    existing = await asyncio.to_thread(_open_test_failure_issues, client, project_key)
+    
+    # Tests that already have an open issue do not count against max_bugs
+    limit = max(0, max_bugs)
+    selected = []
+    skipped = []
+    summaries = set()
+    for suite_name, tc in failures:
+        if len(selected) >= limit:
+            break
+        compact = compact_case(tc)
+        failed_steps = compact.get('failed_steps')
+        bug = _format_test_failure_bug(
+            compact['name'],
+            suite_name,
+            _failure_details(tc),
+            "Failed steps:\n" + "\n".join(f"- {step}" for step in failed_steps) if failed_steps else None,
+            labels
         )
-        
-        issue_key = result.get('key')
-        return json.dumps({
-            "status": "bug_created",
-            "key": issue_key,
-            "id": result.get('id'),
-            "url": f"{client.config.base_url}/browse/{issue_key}",
-            "summary": summary
-        }, ensure_ascii=False)
-    except JiraAPIError as e:
-        return json.dumps({"error": str(e), "status_code": e.status_code})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+        summary = bug[0]
+        if summary in summaries:
+            continue  # Same summary twice in one report: file it once
+        summaries.add(summary)
+        issue_key = existing.get(summary)
+        if issue_key is not None:
+            skipped.append({
+                "suite": suite_name,
+                "test": compact['name'],
+                "key": issue_key,
+                "url": f"{client.config.base_url}/browse/{issue_key}"
+            })
+            continue
+        selected.append((suite_name, compact['name'], bug))
+    
+    semaphore = asyncio.Semaphore(_JIRA_CONCURRENCY)
+    
+    async def create_bug(bug: Tuple[str, str, List[str]]) -> Dict[str, Any]:
+        summary, description, all_labels = bug
+        async with semaphore:
+            return await asyncio.to_thread(
+                client.create_issue,
+                project_key=project_key,
+                summary=summary,
+                description=description,
+                issue_type="Bug",
+                priority=priority,
+                labels=all_labels
+            )
+    
+    outcomes = await asyncio.gather(
+        *(create_bug(bug) for _, _, bug in selected),
+        return_exceptions=True
+    )
+    
+    created = []
+    errors = []
+    for (suite_name, test_name, _), outcome in zip(selected, outcomes):
+        if isinstance(outcome, Exception):
+            errors.append({"suite": suite_name, "test": test_name, "error": str(outcome)})
+        else:
+            issue_key = outcome.get('key')
+            created.append({
+                "suite": suite_name,
+                "test": test_name,
+                "key": issue_key,
+                "url": f"{client.config.base_url}/browse/{issue_key}"
+            })
+    
+    return json.dumps({
+        "status": "completed",
+        "total_failures": len(failures),
+        "created": created,
+        "skipped": skipped,
+        "errors": errors
+    }, ensure_ascii=False)
 
 
 @mcp.tool()
+@_jira_tool
 async def jira_get_projects() -> str:
     """
     Get list of accessible Jira projects.
@@ -529,30 +665,23 @@ async def jira_get_projects() -> str:
     Returns:
         JSON with list of projects including key, name, and project type
     """
-    if error := _check_jira_configured():
-        return error
-    
-    try:
-        client = get_jira_client()
-        projects = client.get_projects()
-        
-        project_list = [{
-            "key": p.get('key'),
-            "name": p.get('name'),
-            "projectTypeKey": p.get('projectTypeKey')
-        } for p in projects]
-        
-        return json.dumps({
-            "total": len(project_list),
-            "projects": project_list
-        }, ensure_ascii=False)
-    except JiraAPIError as e:
-        return json.dumps({"error": str(e), "status_code": e.status_code})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    client = get_jira_client()
+    projects = await asyncio.to_thread(client.get_projects)
+    
+    project_list = [{
+        "key": p.get('key'),
+        "name": p.get('name'),
+        "projectTypeKey": p.get('projectTypeKey')
+    } for p in projects]
+    
+    return json.dumps({
+        "total": len(project_list),
+        "projects": project_list
+    }, ensure_ascii=False)
 
 
 @mcp.tool()
+@_jira_tool
 async def jira_get_issue_types(project_key: str) -> str:
     """
     Get available issue types for a Jira project.
@@ -563,27 +692,19 @@ async def jira_get_issue_types(project_key: str) -> str:
     Returns:
         JSON with list of available issue types
     """
-    if error := _check_jira_configured():
-        return error
-    
-    try:
-        client = get_jira_client()
-        issue_types = client.get_issue_types(project_key)
-        
-        types_list = [{
-            "name": it.get('name'),
-            "description": it.get('description'),
-            "subtask": it.get('subtask', False)
-        } for it in issue_types]
-        
-        return json.dumps({
-            "project": project_key,
-            "issue_types": types_list
-        }, ensure_ascii=False)
-    except JiraAPIError as e:
-        return json.dumps({"error": str(e), "status_code": e.status_code})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    client = get_jira_client()
+    issue_types = await asyncio.to_thread(client.get_issue_types, project_key)
+    
+    types_list = [{
+        "name": it.get('name'),
+        "description": it.get('description'),
+        "subtask": it.get('subtask', False)
+    } for it in issue_types]
+    
+    return json.dumps({
+        "project": project_key,
+        "issue_types": types_list
+    }, ensure_ascii=False)
 
 
 if __name__ == '__main__':
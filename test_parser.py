@@ -1,15 +1,185 @@
 """
 Test script to demonstrate parsing both allure-report and allure-results
 """
-import json
-from allure_html import create_allure_parser, detect_allure_directory_type
+import argparse
+import os
+import re
+import sys
+import traceback
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List
+from allure_html import LazyTestCase, SuiteSummary, create_allure_parser, detect_allure_directory_type
+from json_compat import dumps_bytes, json_loads
 
-def test_parser(directory_path: str):
+
+def _dump_suite(suite: Dict[str, Any]) -> bytes:
+    """Encode one suite as compact JSON, materializing lazy test cases"""
+    # Without orjson the file is written ASCII-escaped, the stdlib encoder's fast path
+    return dumps_bytes(suite, default=LazyTestCase.materialize, ensure_ascii=True)
+
+
+# Encoded suites are handed to os.writev in batches of at most this many
+# buffers (the kernel's IOV_MAX) and about this many bytes, so output goes
+# out in few syscalls without joining it into one bytes object first
+_IOV_MAX = os.sysconf('SC_IOV_MAX') if hasattr(os, 'sysconf') else 1024
+_WRITE_BATCH_BYTES = 1 << 20
+
+
+def _writev_all(fd: int, fragments: List[bytes]) -> None:
+    """Write all fragments with os.writev, resubmitting what a short write left over"""
+    pending = list(fragments)
+    while pending:
+        written = os.writev(fd, pending)
+        done = 0
+        while done < len(pending) and written >= len(pending[done]):
+            written -= len(pending[done])
+            done += 1
+        del pending[:done]
+        if written:
+            pending[0] = memoryview(pending[0])[written:]
+
+
+def save_suites(output_file: str, test_suites: Iterable[Dict[str, Any]]) -> None:
+    """
+    Write {"test-suites": [...]} one suite at a time
+    
+    The suites go to a temporary file next to output_file, which replaces
+    output_file only after the last suite is written; if parsing fails
+    midway the temporary file is removed and output_file is left as it was.
+    """
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        _write_suites(tmp_file, test_suites)
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_file)
+        except OSError:
+            pass
+        raise
+
+
+def _write_suites(output_file: str, test_suites: Iterable[Dict[str, Any]]) -> None:
+    """
+    Write suites as compact JSON, gathered into os.writev batches where
+    available (a 1 MiB buffered writer elsewhere, e.g. on Windows); no
+    full-document bytes object is ever built.
+    """
+    if not hasattr(os, 'writev'):
+        with open(output_file, 'wb', buffering=1 << 20) as f:
+            f.write(b'{"test-suites":[')
+            for i, suite in enumerate(test_suites):
+                if i:
+                    f.write(b',')
+                f.write(_dump_suite(suite))
+            f.write(b']}')
+        return
+    
+    fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        batch = [b'{"test-suites":[']
+        size = len(batch[0])
+        for i, suite in enumerate(test_suites):
+            if i:
+                batch.append(b',')
+            data = _dump_suite(suite)
+            batch.append(data)
+            size += len(data) + 1
+            # At most two buffers are added per suite, so this stays <= IOV_MAX
+            if len(batch) >= _IOV_MAX - 1 or size >= _WRITE_BATCH_BYTES:
+                _writev_all(fd, batch)
+                batch.clear()
+                size = 0
+        batch.append(b']}')
+        _writev_all(fd, batch)
+    finally:
+        os.close(fd)
+
+
+def directory_fingerprint(directory_path: str) -> str:
+    """
+    Cheap fingerprint of a directory: "<device>-<inode>-<newest mtime>-<count>"
+    
+    The device and inode identify the directory itself, so copies made
+    with cp -a, rsync -a or an archive tool, which keep mtimes and entry
+    counts, never share a fingerprint. The rest comes from a single scan
+    of the top level; symlinks are not followed and file contents are
+    never read. allure-results directories are flat, and regenerating an
+    allure-report recreates its data directory, so added, removed or
+    rewritten results change the result. Use --force when in doubt.
+    """
+    directory = os.stat(directory_path)
+    newest = 0
+    count = 0
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            newest = max(newest, entry.stat(follow_symlinks=False).st_mtime_ns)
+            count += 1
+    return f"{directory.st_dev:x}-{directory.st_ino:x}-{newest:x}-{count:x}"
+
+
+def remove_superseded(dir_type: str, fingerprint: str) -> None:
+    """Delete earlier saved results of the same directory, keeping the one for fingerprint"""
+    device, inode = fingerprint.split('-')[:2]
+    # Older outputs of this directory, and names from before the directory
+    # identity was part of the fingerprint ("<newest mtime>-<count>")
+    pattern = re.compile(rf"parsed_{dir_type}_(?:{device}-{inode}-)?[0-9a-f]+-[0-9a-f]+\.json")
+    keep = f"parsed_{dir_type}_{fingerprint}.json"
+    with os.scandir('.') as entries:
+        for entry in entries:
+            if entry.name != keep and pattern.fullmatch(entry.name):
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    pass
+
+
+def describe_suite(index: int, summary: SuiteSummary, lines: List[str]) -> None:
+    """Append the display lines of one suite (its first three test cases at most)"""
+    add = lines.append
+    cases_count = summary.test_cases_count
+    add(f"\n  Suite {index}: {summary.name}")
+    add(f"    Status: {summary.status}")
+    add(f"    Test Cases: {cases_count}")
+    
+    # Show first few test cases
+    for j, tc in enumerate(summary.test_cases[:3], 1):
+        # A present title is shown even when empty; name only stands in when it is missing
+        add(f"      {j}. {tc.name if tc.title is None else tc.title} - {tc.status}")
+    
+    if cases_count > 3:
+        add(f"      ... and {cases_count - 3} more")
+
+
+def describe_suites(
+    test_suites: Iterable[Dict[str, Any]],
+    lines: List[str],
+    case_counts: List[int]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Pass suites through unchanged while recording how to display them
+    
+    Appends each suite's display lines to lines and its test case count
+    to case_counts, so a single streaming pass can both save and describe.
+    """
+    for i, suite in enumerate(test_suites, 1):
+        summary = SuiteSummary.from_suite(suite, max_cases=3)
+        describe_suite(i, summary, lines)
+        case_counts.append(summary.test_cases_count)
+        yield suite
+
+
+def test_parser(directory_path: str, fail_fast: bool = False, force: bool = False, summary_only: bool = False):
     """
     Test the parser with a given directory
     
     Args:
         directory_path: Path to allure-report or allure-results directory
+        fail_fast: Re-raise errors instead of printing them
+        force: Parse again even if a saved result for the same
+            directory fingerprint exists
+        summary_only: Parse only the displayed fields and skip saving
+            the full result
     """
     print(f"\n{'='*60}")
     print(f"Testing parser with: {directory_path}")
@@ -20,64 +190,83 @@ def test_parser(directory_path: str):
         dir_type = detect_allure_directory_type(directory_path)
         print(f"✓ Detected directory type: {dir_type}")
         
-        # Step 2: Create appropriate parser
-        parser = create_allure_parser(directory_path)
-        print(f"✓ Created parser: {parser.__class__.__name__}")
+        # Saved results are named by directory fingerprint, so an unchanged
+        # directory is loaded from its previous output instead of re-parsed;
+        # a summary-only run neither reads nor writes them
+        if summary_only:
+            output_file = None
+            reuse = False
+        else:
+            fingerprint = directory_fingerprint(directory_path)
+            output_file = f"parsed_{dir_type}_{fingerprint}.json"
+            reuse = not force and os.path.exists(output_file)
         
-        # Step 3: Parse the data
-        result = parser.parse()
-        print(f"✓ Parsing successful!")
+        if reuse:
+            with open(output_file, 'rb') as f:
+                test_suites = json_loads(f.read())['test-suites']
+            print(f"✓ Reusing saved result: {output_file}")
+        else:
+            # Step 2: Create appropriate parser
+            parser = create_allure_parser(directory_path, dir_type=dir_type)
+            print(f"✓ Created parser: {parser.display_name}")
         
-        # Step 4: Display summary
-        test_suites = result.get('test-suites', [])
-        total_cases = sum(len(suite.get('test-cases', [])) for suite in test_suites)
+        # Step 3: Parse the data; suites are described and saved as they
+        # stream out of the parser, so only one is held at a time
+        detail_lines = []
+        case_counts = []
+        if reuse:
+            deque(describe_suites(test_suites, detail_lines, case_counts), maxlen=0)
+        elif summary_only:
+            # Only the displayed fields are parsed; nothing is saved
+            for i, summary in enumerate(parser.iter_summaries(), 1):
+                describe_suite(i, summary, detail_lines)
+                case_counts.append(summary.test_cases_count)
+        else:
+            described = describe_suites(parser.iter_suites(lazy=True), detail_lines, case_counts)
+            save_suites(output_file, described)
+            remove_superseded(dir_type, fingerprint)
+        if not reuse:
+            print(f"✓ Parsing successful!")
         
-        print(f"\nSummary:")
-        print(f"  - Test Suites: {len(test_suites)}")
-        print(f"  - Total Test Cases: {total_cases}")
+        # Step 4: Display summary, collected and written in one call
+        lines = [
+            f"\nSummary:",
+            f"  - Test Suites: {len(case_counts)}",
+            f"  - Total Test Cases: {sum(case_counts)}",
+        ]
+        lines.extend(detail_lines)
+        sys.stdout.write('\n'.join(lines) + '\n')
         
-        # Display suite details
-        for i, suite in enumerate(test_suites, 1):
-            suite_name = suite.get('name', 'Unknown')
-            suite_status = suite.get('status', 'unknown')
-            cases_count = len(suite.get('test-cases', []))
-            print(f"\n  Suite {i}: {suite_name}")
-            print(f"    Status: {suite_status}")
-            print(f"    Test Cases: {cases_count}")
-            
-            # Show first few test cases
-            for j, test_case in enumerate(suite.get('test-cases', [])[:3], 1):
-                tc_name = test_case.get('title', test_case.get('name', 'Unknown'))
-                tc_status = test_case.get('status', 'unknown')
-                print(f"      {j}. {tc_name} - {tc_status}")
-            
-            if cases_count > 3:
-                print(f"      ... and {cases_count - 3} more")
+        if not reuse and not summary_only:
+            print(f"\n✓ Full result saved to: {output_file}")
         
-        # Optionally save to file
-        output_file = f"parsed_{dir_type}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        print(f"\n✓ Full result saved to: {output_file}")
-        
-    except Exception as e:
+    except (OSError, ValueError, KeyError) as e:
+        # Missing paths, invalid directories and malformed JSON
+        # (JSONDecodeError is a ValueError); anything else propagates
+        if fail_fast:
+            raise
         print(f"✗ Error: {e}")
-        import traceback
         traceback.print_exc()
 
 
 if __name__ == '__main__':
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: python test_parser.py <path_to_allure_directory>")
-        print("\nExamples:")
-        print("  python test_parser.py /path/to/allure-results")
-        print("  python test_parser.py /path/to/allure-report")
-        sys.exit(1)
+    arg_parser = argparse.ArgumentParser(
+        description="Parse an allure directory and save the result as JSON",
+        epilog=(
+            "Examples:\n"
+            "  python test_parser.py /path/to/allure-results\n"
+            "  python test_parser.py /path/to/allure-report\n"
+            "  python test_parser.py --summary-only /path/to/allure-results"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    arg_parser.add_argument('directory', help="Path to allure-report or allure-results directory")
+    arg_parser.add_argument('--fail-fast', action='store_true', help="Stop with the original exception on errors")
+    arg_parser.add_argument('--force', action='store_true', help="Parse again even if a saved result is up to date")
+    arg_parser.add_argument('--summary-only', action='store_true', help="Only display the summary; parse just the displayed fields and save nothing")
+    args = arg_parser.parse_args()
     
-    directory = sys.argv[1]
-    test_parser(directory)
+    test_parser(args.directory, fail_fast=args.fail_fast, force=args.force, summary_only=args.summary_only)
 
 
 